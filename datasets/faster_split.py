@@ -1,11 +1,15 @@
+import io
 import os
 import shutil
-import glob
+import sys
 from pathlib import Path
 import random # Keep for potential future use or removed completely if not needed, but currently not used for splitting
-import cv2
+import numpy as np
 import time
 from collections import defaultdict
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from split_utils import format_yolo_by_frame, get_class_ids_from_track_ids, link_or_copy, read_gt, read_image_size, read_seq_dims
 
 # --- Configuration ---
 SOURCE_DIR = Path('tracking-2023/train/') # Use Path objects
@@ -117,31 +121,21 @@ CLASS_MAP = {name: i for i, name in enumerate(CLASS_NAMES)}
 
 # --- Helper Functions ---
 
-# Precompute reverse mappings - unchanged
-REVERSE_ID_MAPPINGS = {}
-for snmot, mapping in ID_MAPPINGS.items():
-    reverse_map = {}
-    # Priority: Ball > Goalkeeper > Referee > Player (adjust index check if needed)
-    # Lower index in class_priority list = higher priority
-    class_priority_list = ["player", "goalkeeper", "referee", "ball"]
-    class_priority = {name: i for i, name in enumerate(class_priority_list)}
-
-    # Iterate through priority list from highest to lowest
-    for cls_name in reversed(class_priority_list): # Process ball, then ref, gk, player
-        ids = mapping.get(cls_name, [])
-        for track_id in ids:
-             # Only assign if not already assigned by a higher priority class
-            if track_id not in reverse_map:
-                 reverse_map[track_id] = cls_name
-    REVERSE_ID_MAPPINGS[snmot] = reverse_map
-
-
-def get_class_from_track_id_fast(snmot_name, track_id):
-    """Faster class lookup using precomputed reverse mapping."""
-    # Default to "player" if snmot_name or track_id not in mapping
-    cls_name = REVERSE_ID_MAPPINGS.get(snmot_name, {}).get(track_id, "player")
-    # Return class index directly, default to player index if something goes wrong (shouldn't happen with map)
-    return CLASS_MAP.get(cls_name, CLASS_MAP["player"])
+# Precompute one track_id -> class_id lookup table shared by all sequences: GLOBAL_LUT[snmot_idx, track_id]
+# Priority: Ball > Referee > Goalkeeper > Player. Classes are written from lowest to highest
+# priority, so an id listed under several classes ends up with the highest-priority one.
+# The last row serves unknown sequences and the last column out-of-range track ids (both "player").
+SNMOT_IDX = {name: i for i, name in enumerate(sorted(ID_MAPPINGS))}
+MAX_TRACK_ID = max(track_id for mapping in ID_MAPPINGS.values() for ids in mapping.values() for track_id in ids)
+GLOBAL_LUT = np.full((len(SNMOT_IDX) + 1, MAX_TRACK_ID + 2), CLASS_MAP["player"], dtype=np.int8)
+for snmot, snmot_idx in SNMOT_IDX.items():
+    for cls_name in CLASS_NAMES: # player, goalkeeper, referee, ball
+        GLOBAL_LUT[snmot_idx, ID_MAPPINGS[snmot].get(cls_name, [])] = CLASS_MAP[cls_name]
+
+
+def get_class_lut(snmot_name):
+    """Returns the 1-D class lookup row (a view into GLOBAL_LUT) for a sequence."""
+    return GLOBAL_LUT[SNMOT_IDX.get(snmot_name, -1)]
 
 def read_game_id(gameinfo_path):
     """Reads gameID from gameinfo.ini."""
@@ -156,106 +150,106 @@ def read_game_id(gameinfo_path):
 
 # --- Modified Functions ---
 
-def generate_yolo_labels_all_frames(gt_path, img_dir, output_label_dir, snmot_name):
+def generate_yolo_labels_all_frames(gt_path, img_dir, output_label_dir, snmot_name, label_dir_by_frame=None, class_lut=None):
     """
     Generates ALL YOLO label files for a sequence into the specified output_label_dir.
+    Frames listed in label_dir_by_frame ({frame_id: label_dir}) are written straight into
+    their split's label dir instead, so no label has to be moved afterwards.
     Prepends snmot_name to the output label filenames.
-    Reads each image only once to get dimensions.
+    Reads a single image header to get the (shared) sequence dimensions.
+    class_lut is the sequence's row of GLOBAL_LUT (resolved from snmot_name when omitted).
+    Returns the number of label files written per label dir.
     """
+    label_dir_by_frame = label_dir_by_frame or {}
+    class_lut = get_class_lut(snmot_name) if class_lut is None else class_lut
     print(f"  Generating labels for {snmot_name} (all frames)...")
-    image_dimensions_cache = {} # Cache image dimensions: {frame_id: (w, h) or None}
-    annotations_by_frame = defaultdict(list) # {frame_id: [yolo_line1, yolo_line2,...]}
+    available_frames = set() # Frame ids that have an image on disk
 
     try:
-        with open(gt_path, 'r') as f:
-            lines = f.readlines()
+        # Ids stay compact int32; box coords (x, y, w, h) stay float64 so the 6-decimal labels are exact
+        gt_frame_ids, gt_track_ids, gt_boxes = read_gt(gt_path)
     except FileNotFoundError:
         print(f"  Error: Ground truth file not found: {gt_path}")
-        return 0 # Return count of generated files
-
-    # --- Pass 1: Aggregate annotations and cache image dimensions ---
-    # We need dimensions for normalization. Iterate through images to build cache efficiently.
-    img_paths = sorted(list(img_dir.glob('*.jpg')))
-    if not img_paths:
+        return {}
+    except ValueError as e: # includes pandas' EmptyDataError / ParserError
+        print(f"  Error: Could not parse ground truth file {gt_path}: {e}")
+        return {}
+
+    # --- Pass 1: Aggregate annotations using one dimension lookup per sequence ---
+    # All frames of an SNMOT sequence share the same resolution: take it from seqinfo.ini,
+    # or else from the JPEG header of the first frame (no pixel data is decoded).
+    img_names = sorted(e.name for e in os.scandir(img_dir) if e.name.endswith('.jpg'))
+    if not img_names:
         print(f"  No images found in {img_dir} for {snmot_name}. Cannot generate labels.")
-        return 0
+        return {}
 
-    # Build dimensions cache by reading images once
-    for img_path in img_paths:
+    seq_dims = read_seq_dims(img_dir.parent / 'seqinfo.ini')
+    if seq_dims is not None:
+        img_w, img_h = seq_dims
+    else:
         try:
-            frame_id = int(img_path.stem) # e.g., "000001" -> 1
-            img = cv2.imread(str(img_path))
-            if img is not None:
-                img_h, img_w = img.shape[:2]
-                image_dimensions_cache[frame_id] = (img_w, img_h)
-            else:
-                print(f"  Warning: Could not read image {img_path}. Skipping for dimension cache.")
-                image_dimensions_cache[frame_id] = None # Cache failure
-        except ValueError:
-             print(f"  Warning: Skipping non-numeric image file {img_path.name}.")
-             image_dimensions_cache[img_path.stem] = None # Cache failure by stem name if not numeric
+            img_w, img_h = read_image_size(img_dir / img_names[0])
+        except (OSError, ValueError) as e:
+            print(f"  Error: Could not read image header {img_dir / img_names[0]}: {e}")
+            return {}
 
-    # Now process GT lines using the cache
-    for line in lines:
+    for img_name in img_names:
         try:
-            parts = line.strip().split(',')
-            if len(parts) < 6: continue
-            frame_id = int(parts[0])
-            track_id = int(parts[1])
-            x, y, w, h = map(float, parts[2:6])
-            if w <= 0 or h <= 0: continue # Skip invalid bounding boxes
-        except (ValueError, IndexError): continue
-
-        # Get image dimensions from cache
-        cached_dims = image_dimensions_cache.get(frame_id)
-        if not cached_dims:
-             # print(f"  Warning: Dimensions for frame {frame_id:06d} not in cache or failed to read. Skipping annotation.")
-             continue # Skip annotation if image dimensions aren't available
-
-        img_w, img_h = cached_dims
-
-        # Convert to YOLO format
-        # Ensure coordinates and dimensions are within [0, 1] and valid
-        x_center = (x + w / 2) / img_w
-        y_center = (y + h / 2) / img_h
-        w_norm = w / img_w
-        h_norm = h / img_h
-
-        # Clamp values to the valid range [0, 1]
-        x_center = max(0.0, min(1.0, x_center))
-        y_center = max(0.0, min(1.0, y_center))
-        w_norm = max(0.0, min(1.0, w_norm))
-        h_norm = max(0.0, min(1.0, h_norm))
-
-        # Skip if the box collapsed or became invalid after normalization
-        if w_norm <= 0 or h_norm <= 0:
-            # print(f"  Warning: Normalized box invalid for frame {frame_id}, track {track_id}: w={w_norm:.4f}, h={h_norm:.4f}")
-            continue
-
-
-        class_id = get_class_from_track_id_fast(snmot_name, track_id)
-        annotation_line = f"{class_id} {x_center:.6f} {y_center:.6f} {w_norm:.6f} {h_norm:.6f}\n"
-        annotations_by_frame[frame_id].append(annotation_line)
-
-    # --- Pass 2: Write label files with prefixed names ---
-    output_label_dir.mkdir(parents=True, exist_ok=True) # Ensure dir exists
-    written_count = 0
+            available_frames.add(int(img_name[:-4])) # e.g., "000001.jpg" -> 1
+        except ValueError:
+             print(f"  Warning: Skipping non-numeric image file {img_name}.")
+
+    # Drop invalid boxes and frames without an image before doing any conversion work
+    # (w > 0 also guarantees the normalized width stays > 0 after clamping)
+    keep = (gt_boxes[:, 2] > 0) & (gt_boxes[:, 3] > 0)
+    keep &= np.isin(gt_frame_ids, np.fromiter(available_frames, dtype=np.int32, count=len(available_frames)))
+    if not keep.any():
+        print("  Generated 0 label files for 0 frames with annotations.")
+        return {}
+    frame_ids = gt_frame_ids[keep]
+    track_ids = gt_track_ids[keep]
+
+    # Convert every row to YOLO format in one preallocated (N, 5) array, in place:
+    # [class_id, x_center, y_center, w_norm, h_norm], clamped to the valid range [0, 1]
+    yolo = np.empty((len(frame_ids), 5), dtype=np.float64)
+    yolo[:, 0] = get_class_ids_from_track_ids(class_lut, track_ids)
+    yolo[:, 1:] = gt_boxes[keep]
+    yolo[:, 1:3] += yolo[:, 3:5] / 2
+    yolo[:, 1:] /= (img_w, img_h, img_w, img_h)
+    np.clip(yolo[:, 1:], 0.0, 1.0, out=yolo[:, 1:])
+
+    # {frame_id: b"line1\nline2\n..."}, gt.txt order kept inside each frame
+    annotations_by_frame = format_yolo_by_frame(frame_ids, yolo)
+
+    # --- Pass 2: Write label files with prefixed names into their split dirs ---
     # Write labels only for frames that had valid annotations AND had their dimensions cached
-    frames_with_annotations = sorted(annotations_by_frame.keys()) # Sort for consistent order
-    for frame_id in frames_with_annotations:
-        lines_to_write = annotations_by_frame[frame_id]
-        # <<< CHANGE: Add prefix to label filename >>>
-        prefixed_label_name = f"{snmot_name}_{frame_id:06d}.txt"
-        label_file = output_label_dir / prefixed_label_name
+    # Format every file body up front, then overlap the small writes on a thread pool
+    label_payloads = []
+    for frame_id, payload in annotations_by_frame.items(): # Ascending frame order
+        label_dir = label_dir_by_frame.get(frame_id, output_label_dir)
+        label_payloads.append((label_dir, f"{label_dir}{os.sep}{snmot_name}_{frame_id:06d}.txt", payload))
+    for label_dir in {item[0] for item in label_payloads}:
+        label_dir.mkdir(parents=True, exist_ok=True) # Ensure dir exists
+
+    def write_label(item):
+        label_dir, label_file, payload = item
         try:
-            with open(label_file, 'w') as f:
-                f.writelines(lines_to_write)
-            written_count += 1
+            with open(label_file, 'wb') as f:
+                f.write(payload)
+            return label_dir
         except IOError as e:
             print(f"  Error writing label file {label_file}: {e}")
+            return None
+
+    written_by_dir = defaultdict(int)
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        for label_dir in executor.map(write_label, label_payloads):
+            if label_dir is not None:
+                written_by_dir[label_dir] += 1
 
+    written_count = sum(written_by_dir.values())
     print(f"  Generated {written_count} label files for {len(annotations_by_frame)} frames with annotations.")
-    return written_count # Return the count
+    return written_by_dir
 
 
 def process_sequence(seq_path: Path):
@@ -281,7 +275,7 @@ def process_sequence(seq_path: Path):
     valid_img_dir = target_seq_dir / 'valid' / 'images'
     test_img_dir = target_seq_dir / 'test' / 'images'
 
-    # We generate all labels initially into the train label directory, then move valid/test
+    # Labels are written directly into the split that owns their frame
     train_label_dir = target_seq_dir / 'train' / 'labels'
     valid_label_dir = target_seq_dir / 'valid' / 'labels'
     test_label_dir = target_seq_dir / 'test' / 'labels'
@@ -301,7 +295,8 @@ def process_sequence(seq_path: Path):
     except Exception as e: print(f"  Error copying gameinfo.ini: {e}")
 
     # List images and SORT chronologically (remove random.shuffle)
-    img_list = sorted(list(img_dir.glob('*.jpg')))
+    # Plain file names (str) keep Path allocation out of the distribution loops below
+    img_list = sorted(e.name for e in os.scandir(img_dir) if e.name.endswith('.jpg'))
     if not img_list: print(f"  Skipping {snmot_name} (no jpg images found)"); return
 
     total_frames = len(img_list)
@@ -320,88 +315,79 @@ def process_sequence(seq_path: Path):
     print(f"  Test frames:  {len(test_imgs)} ({num_test})")
 
 
-    # --- Generate ALL Labels (into train_label_dir initially) ---
+    # Route each frame's label to its split (frames not listed default to train_label_dir)
+    label_dir_by_frame = {}
+    for split_imgs, label_dir in ((valid_imgs, valid_label_dir), (test_imgs, test_label_dir)):
+        for img_name in split_imgs:
+            try:
+                label_dir_by_frame[int(img_name[:-4])] = label_dir
+            except ValueError:
+                pass # Non-numeric names never get labels
+
+    # --- Generate ALL Labels (directly into their split label dirs) ---
     # This processes the entire gt.txt and creates label files for *all* images in the sequence.
-    num_generated_labels = generate_yolo_labels_all_frames(gt_path, img_dir, train_label_dir, snmot_name)
-    if num_generated_labels == 0:
-         print(f"  Skipping image/label distribution for {snmot_name} due to no labels generated.")
+    written_by_dir = generate_yolo_labels_all_frames(gt_path, img_dir, train_label_dir, snmot_name, label_dir_by_frame,
+                                                     class_lut=get_class_lut(snmot_name))
+    if not written_by_dir:
+         print(f"  Skipping image distribution for {snmot_name} due to no labels generated.")
          return # Exit processing for this sequence if no labels were generated
+    train_labels = written_by_dir.get(train_label_dir, 0)
+    valid_labels = written_by_dir.get(valid_label_dir, 0)
+    test_labels = written_by_dir.get(test_label_dir, 0)
 
-    # --- Copy Images and Move Labels to respective directories ---
+    # --- Copy Images to respective directories ---
 
-    print(f"  Distributing images and labels...")
+    print("  Distributing images...")
     copied_train_images = 0
     copied_valid_images = 0
     copied_test_images = 0
-    moved_valid_labels = 0
-    moved_test_labels = 0
+    source_prefix = f"{img_dir}{os.sep}" # str paths: no Path objects built per image
 
     # Process Train Set
-    for img_path in train_imgs:
-        prefixed_img_name = f"{snmot_name}_{img_path.name}"
-        target_img_path = train_img_dir / prefixed_img_name
-        # Label is already in train_label_dir with the correct prefix
+    train_target_prefix = f"{train_img_dir}{os.sep}{snmot_name}_"
+    for img_name in train_imgs:
         try:
-            shutil.copy(img_path, target_img_path)
+            link_or_copy(source_prefix + img_name, train_target_prefix + img_name)
             copied_train_images += 1
-        except Exception as e: print(f"  Error copying train image {img_path.name}: {e}")
+        except Exception as e: print(f"  Error copying train image {img_name}: {e}")
     print(f"  Copied {copied_train_images} train images.")
 
     # Process Validation Set
-    for img_path in valid_imgs:
-        prefixed_img_name = f"{snmot_name}_{img_path.name}"
-        target_img_path = valid_img_dir / prefixed_img_name
-        original_label_stem = img_path.stem # e.g., "000001"
-        prefixed_label_name = f"{snmot_name}_{original_label_stem}.txt"
-        source_label_path = train_label_dir / prefixed_label_name
-        target_label_path = valid_label_dir / prefixed_label_name
-
+    valid_target_prefix = f"{valid_img_dir}{os.sep}{snmot_name}_"
+    for img_name in valid_imgs:
         try:
-            shutil.copy(img_path, target_img_path)
+            link_or_copy(source_prefix + img_name, valid_target_prefix + img_name)
             copied_valid_images += 1
-        except Exception as e: print(f"  Error copying valid image {img_path.name}: {e}")
-
-        if source_label_path.is_file():
-            try:
-                shutil.move(str(source_label_path), str(target_label_path)) # Use strings for move
-                moved_valid_labels += 1
-            except Exception as e: print(f"  Error moving valid label {prefixed_label_name}: {e}")
-        # else: # Optional warning if a label is missing for a frame
-        #    print(f"  Warning: Label file {prefixed_label_name} not found for valid image {img_path.name}")
-
-    print(f"  Copied {copied_valid_images} valid images, moved {moved_valid_labels} valid labels.")
+        except Exception as e: print(f"  Error copying valid image {img_name}: {e}")
+    print(f"  Copied {copied_valid_images} valid images.")
 
     # Process Test Set
-    for img_path in test_imgs:
-        prefixed_img_name = f"{snmot_name}_{img_path.name}"
-        target_img_path = test_img_dir / prefixed_img_name
-        original_label_stem = img_path.stem # e.g., "000001"
-        prefixed_label_name = f"{snmot_name}_{original_label_stem}.txt"
-        source_label_path = train_label_dir / prefixed_label_name
-        target_label_path = test_label_dir / prefixed_label_name
-
+    test_target_prefix = f"{test_img_dir}{os.sep}{snmot_name}_"
+    for img_name in test_imgs:
         try:
-            shutil.copy(img_path, target_img_path)
+            link_or_copy(source_prefix + img_name, test_target_prefix + img_name)
             copied_test_images += 1
-        except Exception as e: print(f"  Error copying test image {img_path.name}: {e}")
-
-        if source_label_path.is_file():
-            try:
-                shutil.move(str(source_label_path), str(target_label_path)) # Use strings for move
-                moved_test_labels += 1
-            except Exception as e: print(f"  Error moving test label {prefixed_label_name}: {e}")
-         # else: # Optional warning
-         #    print(f"  Warning: Label file {prefixed_label_name} not found for test image {img_path.name}")
-
-    print(f"  Copied {copied_test_images} test images, moved {moved_test_labels} test labels.")
+        except Exception as e: print(f"  Error copying test image {img_name}: {e}")
+    print(f"  Copied {copied_test_images} test images.")
 
     # --- Final Log ---
     end_time = time.time()
     duration = end_time - start_time
     print(f"✅ Processed {snmot_name} → gameID {game_id} in {duration:.2f}s.")
-    print(f"  Train: {copied_train_images} images, {copied_train_images - moved_valid_labels - moved_test_labels} labels (remaining)") # Labels remaining in train_label_dir
-    print(f"  Valid: {copied_valid_images} images, {moved_valid_labels} labels")
-    print(f"  Test:  {copied_test_images} images, {moved_test_labels} labels")
+    print(f"  Train: {copied_train_images} images, {train_labels} labels")
+    print(f"  Valid: {copied_valid_images} images, {valid_labels} labels")
+    print(f"  Test:  {copied_test_images} images, {test_labels} labels")
+
+
+def process_sequence_logged(seq_path: Path):
+    """
+    Runs process_sequence with its output captured and returns the log text (for worker processes).
+    The print() calls only append to an in-memory buffer, so logging costs no syscalls in the worker.
+    """
+    log = io.StringIO()
+    with redirect_stdout(log):
+        process_sequence(seq_path)
+    return log.getvalue()
 
 
 def main():
@@ -413,7 +399,7 @@ def main():
         print(f"Error: Source directory not found: {SOURCE_DIR}")
         return
 
-    sequences = sorted([d for d in SOURCE_DIR.iterdir() if d.is_dir()]) # Sort for consistent order
+    sequences = sorted(Path(e.path) for e in os.scandir(SOURCE_DIR) if e.is_dir()) # Sort for consistent order
     # Filter sequences based on ID_MAPPINGS keys if necessary, or process all found directories
     # sequences = sorted([d for d in SOURCE_DIR.iterdir() if d.is_dir() and d.name in ID_MAPPINGS])
 
@@ -426,14 +412,21 @@ def main():
     print(f"Split Ratio: Train={TRAIN_RATIO*100:.0f}%, Valid={VALID_RATIO*100:.0f}%, Test={TEST_RATIO*100:.0f}% (Chronological)")
     print("-" * 30)
 
+    to_process = []
     for seq_path in sequences:
         if seq_path.name not in ID_MAPPINGS:
              print(f"Skipping {seq_path.name}: Not found in ID_MAPPINGS.")
              print("-" * 30)
              continue # Skip directories not listed in ID_MAPPINGS
-
-        process_sequence(seq_path)
-        print("-" * 30)
+        to_process.append(seq_path)
+
+    # Sequences are independent (own gt.txt, prefixed output names), so process them in parallel
+    if to_process:
+        with ProcessPoolExecutor(max_workers=min(len(to_process), os.cpu_count())) as executor:
+            # Each worker returns its log; the parent prints them so sequences don't interleave
+            for seq_log in executor.map(process_sequence_logged, to_process):
+                sys.stdout.write(seq_log + "-" * 30 + "\n") # One write per sequence
+                sys.stdout.flush()
 
     overall_end_time = time.time()
     print(f"\nProcessing complete. Total time: {overall_end_time - overall_start_time:.2f} seconds.")
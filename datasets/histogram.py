@@ -1,33 +1,30 @@
-import os
 from pathlib import Path
-from collections import Counter, defaultdict
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
+from label_scan import CLASS_NAMES, SIZE_CENTERS, median_from_histogram, scan_split_tree
+
+try:
+    from fast_histogram import histogram1d  # optional: uniform-bin histogram without searchsorted
+except ImportError:
+    histogram1d = None
 
 # --- Configuration ---
 TARGET_DIR = Path("./split")  # Root split directory
-CLASS_NAMES = ["player", "goalkeeper", "referee", "ball"]
-CLASS_MAP = {i: name for i, name in enumerate(CLASS_NAMES)}
 PLOT_HISTOGRAM = True  # Set False if you don't want to display histogram
 
 
-def count_instances_and_sizes(label_dir):
-    counter = Counter()
-    bbox_sizes = defaultdict(list)
-    for label_file in label_dir.glob("*.txt"):
-        with open(label_file, 'r') as f:
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) != 5:
-                    continue
-                class_id = int(parts[0])
-                w = float(parts[3])
-                h = float(parts[4])
-                size = w * h * (1920 * 1080)  # Assume image resolution 1920x1080 for pixel^2 scale
-                counter[class_id] += 1
-                bbox_sizes[class_id].append(size)
-    return counter, bbox_sizes
+def uniform_histogram(values, bins, lo, hi, weights=None):
+    """Histogram with uniform bins over [lo, hi]; uses fast-histogram when it is installed."""
+    if hi <= lo:
+        hi = lo + 1.0
+    values = np.clip(values, lo, hi)
+    edges = np.linspace(lo, hi, bins + 1)
+    if histogram1d is None:
+        counts, _ = np.histogram(values, bins=edges, weights=weights)
+    else:
+        # fast-histogram's range is half-open; nudge the upper edge so the max value is counted
+        counts = histogram1d(values, bins=bins, range=(lo, np.nextafter(hi, np.inf)), weights=weights)
+    return counts, edges
 
 
 def main():
@@ -35,27 +32,10 @@ def main():
         print(f"Target dir not found: {TARGET_DIR}")
         return
 
-    # Count map and size map structures
-    count_map = {split: defaultdict(int) for split in ["train", "valid", "test"]}
-    size_map = defaultdict(lambda: defaultdict(list))
-
-    for game_dir in TARGET_DIR.iterdir():
-        if not game_dir.is_dir():
-            continue
-
-        for split in ["train", "valid", "test"]:
-            label_dir = game_dir / split / "labels"
-            if label_dir.is_dir():
-                counts, sizes = count_instances_and_sizes(label_dir)
-                for cls_id, c in counts.items():
-                    cls_name = CLASS_MAP[cls_id]
-                    count_map[split][cls_name] += c
-                for cls_id, s in sizes.items():
-                    cls_name = CLASS_MAP[cls_id]
-                    size_map[cls_name][split].extend(s)
+    # One walk over the split tree yields both the count table and the size statistics
+    df, size_stats = scan_split_tree(TARGET_DIR)
 
     # === Display Table of Counts ===
-    df = pd.DataFrame(count_map).fillna(0).astype(int)
     print("\n📊 Bounding Box Count per Class and Dataset Split:")
     print(df)
 
@@ -65,22 +45,26 @@ def main():
         all_means = []
         all_medians = []
 
-        for cls_name in CLASS_NAMES:
-            all_sizes = (
-                size_map[cls_name]['train'] +
-                size_map[cls_name]['valid'] +
-                size_map[cls_name]['test']
+        for cls_id, cls_name in enumerate(CLASS_NAMES):
+            class_hist = size_stats["hist"][cls_id]
+            if not class_hist.any():
+                continue
+            mean_size = size_stats["sum"][cls_id] / class_hist.sum()  # over sized boxes only
+            # Re-bin the fine size bins into 100 uniform bars over the observed size range
+            filled = np.flatnonzero(class_hist)
+            hist_counts, hist_edges = uniform_histogram(
+                SIZE_CENTERS[filled], bins=100, lo=size_stats["min"][cls_id], hi=size_stats["max"][cls_id],
+                weights=class_hist[filled].astype(np.float64)
+            )
+            plt.stairs(
+                hist_counts,
+                hist_edges,
+                alpha=0.5,
+                label=f"{cls_name} (avg: {mean_size:.1f})",
+                fill=True
             )
-            if all_sizes:
-                plt.hist(
-                    all_sizes,
-                    bins=100,
-                    alpha=0.5,
-                    label=f"{cls_name} (avg: {np.mean(all_sizes):.1f})",
-                    histtype='stepfilled'
-                )
-                all_means.append((cls_name, np.mean(all_sizes)))
-                all_medians.append((cls_name, np.median(all_sizes)))
+            all_means.append((cls_name, mean_size))
+            all_medians.append((cls_name, median_from_histogram(class_hist)))
 
         plt.xlabel("Bounding Box Size (px²)")
         plt.ylabel("Number of Instances")
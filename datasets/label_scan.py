@@ -0,0 +1,307 @@
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit  # optional: compiled parser for the many tiny label files
+except ImportError:
+    njit = None
+
+# --- Configuration ---
+CLASS_NAMES = ["player", "goalkeeper", "referee", "ball"]
+SPLIT_NAMES = ["train", "valid", "test"]
+FRAME_AREA = 1920 * 1080  # Assume image resolution 1920x1080 for pixel^2 scale
+CACHE_DIR = Path(".cache/label_scan")  # Per label-dir scan results, reused while the labels are unchanged
+CACHE_VERSION = 2  # Bump whenever the parser or the cached stats layout changes
+
+# Sizes are binned into fixed log-spaced bins instead of being retained, so memory stays O(bins).
+# Relative bin width is ~0.15%, which bounds the error of the reported median.
+SIZE_BINS = 10_000
+SIZE_EDGES = np.geomspace(1.0, FRAME_AREA, SIZE_BINS + 1)
+SIZE_CENTERS = np.sqrt(SIZE_EDGES[:-1] * SIZE_EDGES[1:])
+
+
+def _parse_yolo_buffer(buf):
+    """
+    Parse a YOLO label buffer (uint8 array) line by line into class ids and normalized w*h products.
+    Every non-empty line whose first token is an integer yields one id; its wh is NaN unless the line
+    holds exactly five valid numbers. Lines with a non-integer class token are dropped.
+    """
+    n = buf.shape[0]
+    ids = np.empty(n // 2 + 1, dtype=np.int64)  # a line needs at least one char plus a newline
+    wh = np.empty(n // 2 + 1, dtype=np.float64)
+    values = np.zeros(5, dtype=np.float64)
+    rows = 0
+    i = 0
+    while i < n:
+        tokens = 0
+        numeric = True  # every token on the line is a valid number
+        class_ok = False
+        class_id = 0
+        while i < n and buf[i] != 10:  # until '\n'
+            c = int(buf[i])
+            if c == 32 or c == 9 or c == 13:  # whitespace
+                i += 1
+                continue
+            sign = 1.0
+            if c == 45:  # '-'
+                sign = -1.0
+                i += 1
+            elif c == 43:  # '+'
+                i += 1
+            mantissa = 0.0
+            scale = 1.0
+            digits = 0
+            seen_dot = False
+            while i < n:
+                c = int(buf[i])
+                if 48 <= c <= 57:
+                    mantissa = mantissa * 10.0 + (c - 48)
+                    digits += 1
+                    if seen_dot:
+                        scale *= 10.0
+                elif c == 46 and not seen_dot:  # '.'
+                    seen_dot = True
+                else:
+                    break
+                i += 1
+            valid = digits > 0  # rejects stray '-', '.', 'e5'
+            seen_exp = False
+            exponent = 0
+            if valid and i < n and (buf[i] == 101 or buf[i] == 69):  # 'e' / 'E'
+                seen_exp = True
+                i += 1
+                exp_sign = 1
+                if i < n and (buf[i] == 45 or buf[i] == 43):
+                    exp_sign = -1 if buf[i] == 45 else 1
+                    i += 1
+                exp_digits = 0
+                while i < n and 48 <= buf[i] <= 57:
+                    exponent = exponent * 10 + (int(buf[i]) - 48)
+                    exp_digits += 1
+                    i += 1
+                valid = exp_digits > 0
+                exponent *= exp_sign
+            # The token must end at whitespace; otherwise skip the rest of it and mark it invalid
+            while i < n and not (buf[i] == 32 or buf[i] == 9 or buf[i] == 10 or buf[i] == 13):
+                valid = False
+                i += 1
+            value = sign * mantissa / scale * 10.0 ** exponent
+            if tokens == 0:
+                class_ok = valid and not seen_dot and not seen_exp
+                class_id = np.int64(value)
+            if tokens < 5:
+                values[tokens] = value
+            numeric = numeric and valid
+            tokens += 1
+        i += 1  # skip the newline
+        if not class_ok:
+            continue  # empty line or non-integer class token
+        ids[rows] = class_id
+        wh[rows] = values[3] * values[4] if numeric and tokens == 5 else np.nan
+        rows += 1
+    return ids[:rows], wh[:rows]
+
+
+if njit is not None:
+    _parse_yolo_buffer = njit(cache=True)(_parse_yolo_buffer)
+
+
+def _parse_yolo_lines(data):
+    """Pure-Python per-line parser with the same rules as _parse_yolo_buffer (used without numba)."""
+    ids, wh = [], []
+    for line in data.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        try:
+            class_id = int(parts[0])
+        except ValueError:
+            continue
+        size = np.nan
+        if len(parts) == 5:
+            try:
+                values = [float(p) for p in parts]
+                size = values[3] * values[4]
+            except ValueError:
+                pass
+        ids.append(class_id)
+        wh.append(size)
+    return np.array(ids, dtype=np.int64), np.array(wh, dtype=np.float64)
+
+
+def parse_yolo_bytes(data):
+    """
+    Parse raw label file bytes into (ids, wh), one entry per line with an integer class id.
+    wh is NaN for lines that are not five valid numbers, so they are counted but not sized.
+    """
+    if njit is not None:
+        return _parse_yolo_buffer(np.frombuffer(data, dtype=np.uint8))
+    # Without numba, let NumPy convert a well-formed file in one call and fall back to per-line parsing
+    lines = [line.split() for line in data.splitlines()]
+    lines = [parts for parts in lines if parts]
+    if not lines:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    if all(len(parts) == 5 for parts in lines):
+        try:
+            arr = np.array(lines).astype(np.float64)
+        except ValueError:
+            arr = None
+        if arr is not None and all(parts[0].lstrip(b"+-").isdigit() for parts in lines):
+            return arr[:, 0].astype(np.int64), arr[:, 3] * arr[:, 4]
+    return _parse_yolo_lines(data)
+
+
+def parse_label_file(task):
+    """Parse a single label file into per-class counts, size sums and size-bin indices (runs in a worker process)."""
+    key, label_file = task  # key is echoed back so the caller can route the result
+    num_classes = len(CLASS_NAMES)
+    counts = np.zeros(num_classes, dtype=np.int64)
+    size_sums = np.zeros(num_classes, dtype=np.float64)
+    size_min = np.full(num_classes, np.inf)
+    size_max = np.full(num_classes, -np.inf)
+    flat_bins = np.empty(0, dtype=np.int64)  # class_id * SIZE_BINS + size bin
+    empty = (key, counts, size_sums, size_min, size_max, flat_bins, None)
+    try:
+        # Read the whole (tiny) label file in one go; malformed lines are dropped, not the whole file
+        with open(label_file, 'rb') as f:
+            ids, wh = parse_yolo_bytes(f.read())
+        if ids.size == 0:
+            return empty
+        known = (ids >= 0) & (ids < num_classes)
+        # Every line with a known class is counted; only five-number lines carry a size
+        counts = np.bincount(ids[known], minlength=num_classes)
+        sized = known & ~np.isnan(wh)
+        ids, sizes = ids[sized], wh[sized] * FRAME_AREA
+        # Per-class size sums in one pass (mean = sum / number of sized boxes)
+        size_sums = np.bincount(ids, weights=sizes, minlength=num_classes)
+        np.minimum.at(size_min, ids, sizes)
+        np.maximum.at(size_max, ids, sizes)
+        bins = np.clip(np.searchsorted(SIZE_EDGES, sizes, side='right') - 1, 0, SIZE_BINS - 1)
+        flat_bins = ids * SIZE_BINS + bins
+        return key, counts, size_sums, size_min, size_max, flat_bins, None
+    except Exception as e:
+        return empty[:-1] + (f"Failed to process label file {label_file}: {e}",)
+
+
+def _dir_signature(entries):
+    """Cache key for a label dir: file count plus newest file mtime (changes whenever a label is added or rewritten)."""
+    return len(entries), max((e.stat().st_mtime_ns for e in entries), default=0)
+
+
+def _cache_path(label_dir):
+    return CACHE_DIR / (hashlib.sha1(os.path.abspath(label_dir).encode()).hexdigest() + ".pkl")
+
+
+def _cache_key(signature):
+    """Full cache key: the dir signature plus everything that shapes the cached stats (format version, size bins)."""
+    return (CACHE_VERSION, SIZE_BINS, FRAME_AREA) + tuple(signature)
+
+
+def _load_dir_cache(label_dir, signature):
+    """Return the cached stats of a label dir if its signature and the cache format still match, else None."""
+    try:
+        with open(_cache_path(label_dir), 'rb') as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    return cached["stats"] if cached.get("key") == _cache_key(signature) else None
+
+
+def _save_dir_cache(label_dir, signature, stats):
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_cache_path(label_dir), 'wb') as f:
+            pickle.dump({"key": _cache_key(signature), "stats": stats}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"Could not write scan cache for {label_dir}: {e}")
+
+
+def scan_split_tree(root, use_cache=True):
+    """
+    Walk <root>/<game>/<split>/labels once and aggregate every label file in parallel.
+    Per-directory results are cached under CACHE_DIR, so unchanged label dirs are not re-parsed;
+    dirs with unreadable files are not cached, so those files are retried on the next run.
+    Returns (counts_df, size_stats): a class x split count table and per-class size
+    statistics {"sum", "min", "max", "hist"} as NumPy arrays indexed by class id. Counts include every
+    line with a known class id; the size statistics cover only lines with five valid numbers.
+    """
+    num_classes = len(CLASS_NAMES)
+
+    # Collect every label dir up front so parsing can be spread across cores
+    label_dirs = []  # (split, label_dir, signature)
+    tasks = []
+    dir_stats = []  # per label dir: [counts, size_sums, size_min, size_max, [flat_bins...]] or a cached tuple
+    failed_dirs = set()  # label dirs with at least one file that could not be read
+    for game_entry in os.scandir(root):
+        if not game_entry.is_dir():
+            continue
+
+        for split in SPLIT_NAMES:
+            label_dir = os.path.join(game_entry.path, split, "labels")
+            if not os.path.isdir(label_dir):
+                continue
+            # Inode order keeps cold-cache reads close together on disk (the aggregation is order-independent)
+            entries = sorted((e for e in os.scandir(label_dir) if e.name.endswith(".txt")), key=lambda e: e.inode())
+            signature = _dir_signature(entries)
+            cached = _load_dir_cache(label_dir, signature) if use_cache else None
+            if cached is None:
+                tasks.extend((len(label_dirs), e.path) for e in entries)
+                cached = [np.zeros(num_classes, dtype=np.int64), np.zeros(num_classes, dtype=np.float64),
+                          np.full(num_classes, np.inf), np.full(num_classes, -np.inf), []]
+            label_dirs.append((split, label_dir, signature))
+            dir_stats.append(cached)
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for i, counts, sums, mins, maxs, flat_bins, error in executor.map(parse_label_file, tasks, chunksize=128):
+            if error:
+                print(error)
+                failed_dirs.add(i)
+                continue
+            stats = dir_stats[i]
+            stats[0] += counts
+            stats[1] += sums
+            np.minimum(stats[2], mins, out=stats[2])
+            np.maximum(stats[3], maxs, out=stats[3])
+            stats[4].append(flat_bins)
+
+    # Freshly scanned dirs: compress their size bins to (bin, count) pairs and store them in the cache
+    for i, stats in enumerate(dir_stats):
+        if isinstance(stats, list):
+            flat_bins = np.concatenate(stats[4]) if stats[4] else np.empty(0, dtype=np.int64)
+            stats = dir_stats[i] = tuple(stats[:4]) + np.unique(flat_bins, return_counts=True)
+            if use_cache and i not in failed_dirs:
+                _save_dir_cache(label_dirs[i][1], label_dirs[i][2], stats)
+
+    count_map = {split: np.zeros(num_classes, dtype=np.int64) for split in SPLIT_NAMES}
+    size_sums = np.zeros(num_classes, dtype=np.float64)
+    size_min = np.full(num_classes, np.inf)
+    size_max = np.full(num_classes, -np.inf)
+    size_hist = np.zeros(num_classes * SIZE_BINS, dtype=np.int64)
+    for (split, _, _), (counts, sums, mins, maxs, bin_ids, bin_counts) in zip(label_dirs, dir_stats):
+        count_map[split] += counts
+        size_sums += sums
+        np.minimum(size_min, mins, out=size_min)
+        np.maximum(size_max, maxs, out=size_max)
+        np.add.at(size_hist, bin_ids, bin_counts)
+
+    counts_df = pd.DataFrame(count_map, index=CLASS_NAMES).astype(int)
+    size_stats = {
+        "sum": size_sums,
+        "min": size_min,
+        "max": size_max,
+        "hist": size_hist.reshape(num_classes, SIZE_BINS),
+    }
+    return counts_df, size_stats
+
+
+def median_from_histogram(hist):
+    """Median estimate from fixed size bins: centers of the bins holding the middle sample(s)."""
+    cumulative = np.cumsum(hist)
+    n = cumulative[-1]
+    middle = np.searchsorted(cumulative, [(n - 1) // 2, n // 2], side='right')
+    return SIZE_CENTERS[middle].mean()
@@ -48,10 +48,7 @@ for frame_id in sorted(annotations.keys()):
         cv2.putText(img, f"ID: {track_id}", (x, y - 10),
                     cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
 
-    # Resize jika perlu:
-    resized_img = cv2.resize(img, (0, 0), fx=1, fy=1)
-
-    cv2.imshow("Frame", resized_img)
+    cv2.imshow("Frame", img)
     key = cv2.waitKey(0)
     if key == 27:
         break
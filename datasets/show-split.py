@@ -1,6 +1,5 @@
 import cv2
 import os
-import glob
 
 SPLIT_BASE = 'split'
 GAME_ID = '4'       # ganti sesuai nama folder gameID
@@ -16,7 +15,7 @@ COLOR_MAP = [(0, 255, 0), (255, 0, 0), (0, 0, 255), (0, 255, 255)]  # warna berb
 cv2.namedWindow("Frame", cv2.WINDOW_NORMAL)
 cv2.resizeWindow("Frame", 960, 540)
 
-image_paths = sorted(glob.glob(os.path.join(IMAGE_DIR, '*.jpg')))
+image_paths = sorted(e.path for e in os.scandir(IMAGE_DIR) if e.name.endswith('.jpg') and e.is_file())
 for idx, img_path in enumerate(image_paths):
     if idx % 20 != 0:  # tampilkan setiap 20 gambar
         continue
@@ -28,7 +27,8 @@ for idx, img_path in enumerate(image_paths):
         print(f"⚠️ Label tidak ditemukan untuk {img_path}")
         continue
 
-    img = cv2.imread(img_path)
+    # Decode langsung di setengah resolusi (sesuai ukuran tampilan), lebih cepat dari decode penuh + resize
+    img = cv2.imread(img_path, cv2.IMREAD_REDUCED_COLOR_2)
     img_h, img_w = img.shape[:2]
 
     # Baca file label
@@ -54,8 +54,7 @@ for idx, img_path in enumerate(image_paths):
         cv2.putText(img, f"{label}", (x, y - 10),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
 
-    resized_img = cv2.resize(img, (0, 0), fx=0.5, fy=0.5)
-    cv2.imshow("Frame", resized_img)
+    cv2.imshow("Frame", img)
     key = cv2.waitKey(0)
     if key == 27:
         break
@@ -1,9 +1,9 @@
 import os
 import shutil
-import glob
 from pathlib import Path
-import random
-import cv2
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from split_utils import format_yolo_by_frame, get_class_ids_from_track_ids, link_or_copy, read_gt, read_image_size, read_seq_dims
 
 SOURCE_DIR = 'tracking-2023/test/'
 TARGET_DIR = './split/'
@@ -93,13 +93,21 @@ ID_MAPPINGS = {
     },
 }
 
-# Fungsi: tentukan kelas berdasarkan track_id
-def get_class_from_track_id(snmot_name, track_id):
+CLASS_NAMES = ["player", "goalkeeper", "referee", "ball"]
+CLASS_MAP = {name: i for i, name in enumerate(CLASS_NAMES)}
+
+# Fungsi: tabel track_id -> class_id untuk satu sequence (default "player")
+def build_class_lut(snmot_name):
+    """
+    Returns an int8 array indexed by track_id; the trailing entry serves out-of-range ids.
+    Classes are written in reverse mapping order, so an id listed twice keeps its first class.
+    """
     mapping = ID_MAPPINGS.get(snmot_name, {})
-    for cls_name, ids in mapping.items():
-        if track_id in ids:
-            return cls_name
-    return "player"  # default
+    max_track_id = max((track_id for ids in mapping.values() for track_id in ids), default=-1)
+    class_lut = np.full(max_track_id + 2, CLASS_MAP["player"], dtype=np.int8)
+    for cls_name, ids in reversed(list(mapping.items())):
+        class_lut[ids] = CLASS_MAP[cls_name]
+    return class_lut
 
 def read_game_id(gameinfo_path):
     with open(gameinfo_path, 'r') as f:
@@ -108,45 +116,64 @@ def read_game_id(gameinfo_path):
                 return line.strip().split("=")[1]
     return "unknown"
 
-def convert_gt_to_yolo_format(gt_path, img_dir, output_dir, snmot_name):
-    with open(gt_path, 'r') as f:
-        lines = f.readlines()
+def list_frame_ids(img_names):
+    """Frame ids (000123.jpg -> 123) of the given image file names, as a NumPy array."""
+    return np.array([int(name[:-4]) for name in img_names if name[:-4].isdigit()], dtype=np.int64)
 
-    annotations = {}
+def build_annotations(gt_path, img_dir, snmot_name, img_dims=None, available_frames=None):
+    """Parses gt.txt once into {frame_id: YOLO label bytes} for every frame that has an image."""
+    # Semua frame dalam satu sequence beresolusi sama: ukuran dibaca sekali, bukan per baris gt.txt
+    if img_dims is None:
+        img_dims = read_seq_dims(os.path.join(os.path.dirname(img_dir), 'seqinfo.ini'))
 
-    for line in lines:
-        parts = line.strip().split(',')
-        frame_id, track_id = int(parts[0]), int(parts[1])
-        x, y, w, h = float(parts[2]), float(parts[3]), float(parts[4]), float(parts[5])
+    if os.path.getsize(gt_path) == 0:
+        return {}
 
-        img_path = os.path.join(img_dir, f"{frame_id:06d}.jpg")
-        if not os.path.exists(img_path):
-            continue
+    # Parse gt.txt langsung dari file dengan tokenizer C pandas; baris rusak di-skip satu per satu
+    # Id tetap int32; koordinat (x, y, w, h) tetap float64 agar label 6 desimal identik
+    frame_ids, track_ids, boxes = read_gt(gt_path)
 
-        img = cv2.imread(img_path)
-        if img is None:
-            continue
-        img_h, img_w = img.shape[:2]
+    # Buang baris yang frame-nya tidak punya gambar: cocokkan dengan hasil satu listing img_dir, tanpa stat per baris
+    if available_frames is None:
+        available_frames = list_frame_ids(e.name for e in os.scandir(img_dir) if e.name.endswith('.jpg'))
+    keep = np.isin(frame_ids, available_frames)
+    if not keep.any():
+        return {}
+    boxes, frame_ids, track_ids = boxes[keep], frame_ids[keep], track_ids[keep]
 
-        x_center = (x + w / 2) / img_w
-        y_center = (y + h / 2) / img_h
-        w_norm = w / img_w
-        h_norm = h / img_h
+    if img_dims is None:
+        # Tanpa seqinfo.ini: probe frame pertama yang ada, lalu pakai ulang untuk semua baris
+        try:
+            img_dims = read_image_size(os.path.join(img_dir, f"{frame_ids[0]:06d}.jpg"))
+        except (OSError, ValueError):
+            return {}
+    img_w, img_h = img_dims
 
-        cls = get_class_from_track_id(snmot_name, track_id)
-        class_id = ["player", "goalkeeper", "referee", "ball"].index(cls)
+    # Kelas semua baris dengan satu gather dari lookup table
+    class_ids = get_class_ids_from_track_ids(build_class_lut(snmot_name), track_ids)
 
-        annotation_line = f"{class_id} {x_center:.6f} {y_center:.6f} {w_norm:.6f} {h_norm:.6f}\n"
+    # Baris YOLO (class, x_center, y_center, w, h) untuk semua baris sekaligus
+    x, y, w, h = boxes.T
+    yolo = np.empty((len(boxes), 5), dtype=np.float64)
+    yolo[:, 0] = class_ids
+    yolo[:, 1] = (x + w / 2) / img_w
+    yolo[:, 2] = (y + h / 2) / img_h
+    yolo[:, 3] = w / img_w
+    yolo[:, 4] = h / img_h
 
-        if frame_id not in annotations:
-            annotations[frame_id] = []
-        annotations[frame_id].append(annotation_line)
+    # Kelompokkan per frame (urutan gt.txt di dalam frame tetap) dan format dengan satu np.savetxt
+    return format_yolo_by_frame(frame_ids, yolo)
 
-    # Tulis satu file .txt per gambar
-    for frame_id, lines in annotations.items():
-        label_file = os.path.join(output_dir, f"{frame_id:06d}.txt")
-        with open(label_file, 'w') as f:
-            f.writelines(lines)
+def write_labels(annotations, frame_ids, output_dir):
+    """Writes one .txt per frame in frame_ids that has annotations."""
+    label_prefix = output_dir + os.sep  # join sekali, bukan os.path.join per frame
+    for frame_id in frame_ids:
+        payload = annotations.get(frame_id)
+        if payload is None:
+            continue
+        label_file = f"{label_prefix}{frame_id:06d}.txt"
+        with open(label_file, 'wb') as f:
+            f.write(payload)  # satu write() per frame
 
 def process_sequence(seq_path):
     gameinfo_path = os.path.join(seq_path, 'gameinfo.ini')
@@ -172,33 +199,67 @@ def process_sequence(seq_path):
 
     shutil.copy(gameinfo_path, target_seq_dir)
 
-    img_list = sorted(glob.glob(os.path.join(img_dir, '*.jpg')))
-    random.seed(42)
-    random.shuffle(img_list)
+    # Nama file saja; path dibentuk dari prefix direktori yang di-join sekali per sequence
+    img_names = [e.name for e in os.scandir(img_dir) if e.name.endswith('.jpg') and e.is_file()]
+    available_frames = list_frame_ids(img_names)  # dipakai ulang oleh konversi label
+    if SPLIT_RATIO >= 1:
+        # Semua gambar ke satu split: urutan tidak berpengaruh, jadi tanpa sort/shuffle
+        train_imgs, valid_imgs = img_names, []
+    else:
+        img_names.sort()
+        # Deterministic split: permute indices in C instead of shuffling the list in Python
+        perm = np.random.default_rng(42).permutation(len(img_names))
 
-    split_idx = int(len(img_list) * SPLIT_RATIO)
-    train_imgs = img_list[:split_idx]
-    valid_imgs = img_list[split_idx:]
+        split_idx = int(len(img_names) * SPLIT_RATIO)
+        train_imgs = [img_names[i] for i in perm[:split_idx]]
+        valid_imgs = [img_names[i] for i in perm[split_idx:]]
 
-    # Copy images
-    for img in train_imgs:
-        shutil.copy(img, train_dir)
-    for img in valid_imgs:
-        shutil.copy(img, valid_dir)
+    source_prefix = img_dir + os.sep
+    train_prefix = train_dir + os.sep
+    valid_prefix = valid_dir + os.sep
 
-    # Konversi semua label
-    convert_gt_to_yolo_format(gt_path, img_dir, train_label_dir, snmot_name)
-    convert_gt_to_yolo_format(gt_path, img_dir, valid_label_dir, snmot_name)
+    # Link (atau copy) images ke folder split di thread pool (I/O), sementara label dikonversi di thread utama
+    with ThreadPoolExecutor(max_workers=4) as io_pool:
+        copy_jobs = [io_pool.submit(link_or_copy, source_prefix + name, train_prefix + name) for name in train_imgs]
+        copy_jobs += [io_pool.submit(link_or_copy, source_prefix + name, valid_prefix + name) for name in valid_imgs]
+
+        # Resolusi sequence dibaca sekali
+        img_dims = read_seq_dims(os.path.join(seq_path, 'seqinfo.ini'))
+        if img_dims is None and img_names:
+            try:
+                img_dims = read_image_size(source_prefix + img_names[0])
+            except (OSError, ValueError):
+                pass  # build_annotations probe ulang frame pertama yang punya label
+        # Konversi sekali; tiap label hanya ditulis ke split yang memuat gambarnya (tanpa label yatim)
+        annotations = build_annotations(gt_path, img_dir, snmot_name, img_dims, available_frames)
+        write_labels(annotations, list_frame_ids(train_imgs).tolist(), train_label_dir)
+        write_labels(annotations, list_frame_ids(valid_imgs).tolist(), valid_label_dir)
+
+        for job in copy_jobs:
+            job.result()  # re-raise copy errors
 
     print(f"✅ Processed {snmot_name} → gameID {game_id}")
 
+def process_game(seq_paths):
+    """Processes the sequences of one game in order: they share split/<gameID>/ and its file names."""
+    for seq_path in seq_paths:
+        process_sequence(seq_path)
+
 def main():
     Path(TARGET_DIR).mkdir(exist_ok=True)
 
-    for snmot_folder in os.listdir(SOURCE_DIR):
-        seq_path = os.path.join(SOURCE_DIR, snmot_folder)
-        if os.path.isdir(seq_path):
-            process_sequence(seq_path)
+    # Sequences dari game yang sama menulis ke split/<gameID>/ dengan nama file yang sama (tanpa prefix SNMOT),
+    # jadi dikelompokkan per game: satu worker per game, urutan sequence di dalam game tetap seperti os.listdir
+    games = {}
+    for entry in os.scandir(SOURCE_DIR):
+        if entry.is_dir():
+            gameinfo_path = os.path.join(entry.path, 'gameinfo.ini')
+            game_id = read_game_id(gameinfo_path) if os.path.exists(gameinfo_path) else None  # di-skip oleh process_sequence
+            games.setdefault(game_id, []).append(entry.path)
+
+    # Game yang berbeda independen: proses paralel di semua core
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(process_game, games.values()))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,130 @@
+import io
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from PIL import Image
+try:
+    import imagesize # Optional: reads (w, h) straight from the JPEG SOF marker
+except ImportError:
+    imagesize = None
+
+# --- Shared by split.py and faster_split.py ---
+GT_READ_BUFFER = 1 << 18  # 256 KiB read buffer for gt.txt (default is 8 KiB)
+GT_DTYPES = {0: np.int32, 1: np.int32, 2: np.float64, 3: np.float64, 4: np.float64, 5: np.float64} # frame, track, x, y, w, h
+
+
+def read_gt(gt_path):
+    """
+    Reads the frame, track_id, x, y, w, h columns of gt.txt as (frame_ids, track_ids, boxes).
+    Ids are int32 and boxes float64. A row with a missing, non-numeric or non-integer-id field
+    is skipped on its own (as the old per-row int()/float() parse did), not the whole file.
+    """
+    with open(gt_path, 'r', buffering=GT_READ_BUFFER) as f: # gt.txt is large; read it in big chunks
+        try:
+            # pandas' C tokenizer parses the CSV considerably faster than np.loadtxt
+            gt = pd.read_csv(f, header=None, usecols=range(6), dtype=GT_DTYPES)
+        except ValueError: # Malformed row(s): re-parse untyped and drop just those rows
+            f.seek(0)
+            gt = pd.read_csv(f, header=None, usecols=range(6), dtype=str, on_bad_lines='skip')
+            gt = gt.apply(pd.to_numeric, errors='coerce').dropna()
+            gt = gt[(gt[[0, 1]] % 1 == 0).all(axis=1)].astype(GT_DTYPES)
+    return gt[0].to_numpy(), gt[1].to_numpy(), gt[[2, 3, 4, 5]].to_numpy()
+
+
+def get_class_ids_from_track_ids(class_lut, track_ids):
+    """
+    Vectorized class lookup: maps an array of track ids to class ids with one gather.
+    class_lut is indexed by track_id; its trailing entry serves out-of-range ids.
+    """
+    sentinel = len(class_lut) - 1 # Out-of-range ids hit the trailing entry
+    return class_lut[np.where((track_ids >= 0) & (track_ids < sentinel), track_ids, sentinel)]
+
+
+def format_yolo_by_frame(frame_ids, yolo):
+    """
+    Formats (N, 5) YOLO rows [class_id, x_center, y_center, w, h] into {frame_id: b"line1\\nline2\\n..."},
+    with frame ids in ascending order and the input row order kept inside each frame.
+    """
+    # Group rows by frame with a stable sort, format every line in one np.savetxt call, then slice per frame
+    order = np.argsort(frame_ids, kind='stable')
+    unique_frames, starts = np.unique(frame_ids[order], return_index=True)
+    buf = io.BytesIO()
+    np.savetxt(buf, yolo[order], fmt='%d %.6f %.6f %.6f %.6f')
+    lines = buf.getvalue().splitlines(keepends=True)
+    bounds = starts.tolist() + [len(lines)]
+    return {frame_id: b''.join(lines[bounds[i]:bounds[i + 1]]) for i, frame_id in enumerate(unique_frames.tolist())}
+
+
+def reflink_copy(src, dst):
+    """
+    Copies src to dst with os.copy_file_range, which reflinks (shares extents) on CoW
+    filesystems such as Btrfs/XFS and copies in-kernel elsewhere. Raises OSError if unsupported.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+    if remaining > 0:
+        raise OSError(f"copy_file_range stopped early for {src}")
+
+
+def link_or_copy(src, dst):
+    """
+    Hardlinks src to dst so no image data is copied. When linking is not possible
+    (e.g. across filesystems) it tries a copy_file_range reflink, then shutil.copyfile,
+    which skips the metadata copy of shutil.copy and uses the kernel sendfile fast path on Linux.
+    An existing dst (re-run) is removed and the link retried once; if dst reappears in between,
+    FileExistsError is raised rather than writing through a link that may share a source inode.
+    Note: hardlinked split images share their inode with the source dataset, so edits to one affect both.
+    """
+    try:
+        os.link(src, dst)
+        return
+    except FileExistsError:
+        os.remove(dst) # Re-run: replace the previous link/copy
+        try:
+            os.link(src, dst)
+            return
+        except FileExistsError:
+            raise
+        except OSError:
+            pass
+    except OSError:
+        pass
+    try:
+        reflink_copy(src, dst)
+    except (OSError, AttributeError): # AttributeError: os.copy_file_range needs Linux + Python 3.8
+        shutil.copyfile(src, dst)
+
+
+def read_seq_dims(seqinfo_path):
+    """Reads (imWidth, imHeight) from seqinfo.ini; returns None if the file or keys are missing."""
+    dims = {}
+    try:
+        with open(seqinfo_path, 'r') as f:
+            for line in f:
+                key, _, value = line.strip().partition("=")
+                if key in ("imWidth", "imHeight"):
+                    dims[key] = int(value)
+    except (FileNotFoundError, ValueError):
+        return None
+    if "imWidth" in dims and "imHeight" in dims:
+        return dims["imWidth"], dims["imHeight"]
+    return None
+
+
+def read_image_size(img_path):
+    """
+    Returns (w, h) from the image header only (no decode); uses imagesize when installed, else PIL's lazy open.
+    Raises OSError (or ValueError) if the header is unreadable.
+    """
+    if imagesize is not None:
+        img_w, img_h = imagesize.get(str(img_path))
+        if img_w > 0 and img_h > 0:
+            return img_w, img_h
+    with Image.open(img_path) as im:
+        return im.size
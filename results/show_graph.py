@@ -1,4 +1,5 @@
-import pandas as pd
+import argparse
+import numpy as np
 import matplotlib.pyplot as plt
 
 # Data dictionary
@@ -47,24 +48,35 @@ data = {
     }
 }
 
-# Convert to DataFrames
-dfs = {key: pd.DataFrame(value) for key, value in data.items()}
+parser = argparse.ArgumentParser(description="Plot per-class metrics of the YOLOv11 variants.")
+parser.add_argument('--save', metavar='PATH', help="also write the figure to PATH (e.g. metrics.png)")
+args = parser.parse_args()
 
 # Metrics to plot
 metrics = ['Precision', 'Recall', 'mAP50', 'mAP50-95']
+models = list(data)
+classes = data[models[0]]['Class']
 
-# Create a plot for each metric
-for metric in metrics:
-    fig, ax = plt.subplots(figsize=(12, 6))
+# Semua skor dalam satu array: scores[model, metric, class]
+scores = np.array([[data[model][metric] for metric in metrics] for model in models])
 
-    for model, df in dfs.items():
-        linestyle = '--' if 'LCA' in model else '-'
-        ax.plot(df['Class'], df[metric], marker='o', linestyle=linestyle, label=model)
+# Satu figure 2x2 untuk keempat metric: satu render, bukan plt.show() per metric
+fig, axes = plt.subplots(2, 2, figsize=(16, 10))
+
+for j, (ax, metric) in enumerate(zip(axes.flat, metrics)):
+    # Satu ax.plot per metric untuk semua model (satu garis per kolom)
+    lines = ax.plot(classes, scores[:, j, :].T, marker='o')
+    for line, model in zip(lines, models):
+        line.set_linestyle('--' if 'LCA' in model else '-')
+        line.set_label(model)
 
     ax.set_title(f'{metric} per Class for Each YOLOv11 Variant')
     ax.set_xlabel('Class')
     ax.set_ylabel(metric)
     ax.legend(loc='lower left')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
+    ax.tick_params(axis='x', labelrotation=45)
+
+fig.tight_layout()
+if args.save:
+    fig.savefig(args.save, dpi=120)
+plt.show()
@@ -31,7 +31,7 @@ from ultralytics.utils import (
     is_github_action_running,
 )
 from ultralytics.utils.downloads import download
-from ultralytics.utils.torch_utils import TORCH_1_9
+from ultralytics.utils.torch_utils import TORCH_1_9, TORCH_2_0
 
 IS_TMP_WRITEABLE = is_dir_writeable(TMP)  # WARNING: must be run once tests start as TMP does not exist on tests/init
 
@@ -71,6 +71,35 @@ def test_model_profile():
     _ = model.predict(im, profile=True)
 
 
+@pytest.mark.parametrize(
+    "cfg, conv2", [("yolo11n-ds.yaml", False), ("yolo11n-ds.yaml", True), ("yolo12s-dspan.yaml", False)]
+)
+def test_model_fuse(cfg, conv2):
+    """Test that model.fuse() folds every BatchNorm2d (Conv, Conv2, LCBHAM) without changing the model output."""
+    from ultralytics.nn.modules import Conv2
+    from ultralytics.nn.tasks import DetectionModel
+
+    model = DetectionModel(cfg, verbose=False)
+    if conv2:  # swap the P2/4 downsample Conv for a Conv2 to cover its fuse path too
+        m = model.model[1]
+        model.model[1] = Conv2(m.conv.in_channels, m.conv.out_channels, 3, 2)
+        model.model[1].f, model.model[1].i, model.model[1].type = m.f, m.i, "Conv2"
+    for m in model.modules():
+        if isinstance(m, torch.nn.BatchNorm2d):  # non-trivial stats so a wrong fold shows in the output
+            m.running_mean.uniform_(-0.5, 0.5)
+            m.running_var.uniform_(0.5, 1.5)
+            torch.nn.init.uniform_(m.weight, 0.5, 1.5)
+            torch.nn.init.uniform_(m.bias, -0.5, 0.5)
+    model.eval()
+    im = torch.rand(1, 3, 64, 64)
+    with torch.no_grad():
+        y = model(im)[0]
+        model.fuse(verbose=False)
+        y_fused = model(im)[0]
+    assert not any(isinstance(m, torch.nn.BatchNorm2d) for m in model.modules())
+    assert torch.allclose(y, y_fused, rtol=1e-4, atol=1e-3)
+
+
 @pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
 def test_predict_txt():
     """Test YOLO predictions with file, directory, and pattern sources listed in a text file."""
@@ -135,6 +164,16 @@ def test_predict_visualize(model):
     YOLO(WEIGHTS_DIR / model)(SOURCE, imgsz=32, visualize=True)
 
 
+@pytest.mark.skipif(not TORCH_2_0, reason="torch.compile requires torch>=2.0")
+@pytest.mark.parametrize("compile", [True, "default", "max-autotune-no-cudagraphs"])
+def test_predict_compile(compile):
+    """Test that predicting with 'compile' set to True or a torch.compile mode wraps the PyTorch model."""
+    model = YOLO(MODEL)
+    model(SOURCE, imgsz=32, compile=compile)
+    assert hasattr(model.predictor.model.model, "_orig_mod")  # torch._dynamo OptimizedModule wrapper
+    assert not isinstance(model.predictor.model.compile, bool)  # nn.Module.compile() not shadowed
+
+
 def test_predict_grey_and_4ch():
     """Test YOLO prediction on SOURCE converted to greyscale and 4-channel images with various filenames."""
     im = Image.open(SOURCE)
@@ -384,6 +384,7 @@ class BasePredictor:
             batch=self.args.batch,
             fuse=True,
             verbose=verbose,
+            compile=self.args.compile,
         )
 
         self.device = self.model.device  # update device
@@ -16,6 +16,7 @@ from PIL import Image
 from ultralytics.utils import ARM64, IS_JETSON, IS_RASPBERRYPI, LINUX, LOGGER, PYTHON_VERSION, ROOT, yaml_load
 from ultralytics.utils.checks import check_requirements, check_suffix, check_version, check_yaml, is_rockchip
 from ultralytics.utils.downloads import attempt_download_asset, is_url
+from ultralytics.utils.torch_utils import TORCH_2_0
 
 
 def check_class_names(names):
@@ -104,6 +105,7 @@ class AutoBackend(nn.Module):
         batch=1,
         fuse=True,
         verbose=True,
+        compile=False,
     ):
         """
         Initialize the AutoBackend for inference.
@@ -117,6 +119,9 @@ class AutoBackend(nn.Module):
             batch (int): Batch-size to assume for inference.
             fuse (bool): Fuse Conv2D + BatchNorm layers for optimization. Defaults to True.
             verbose (bool): Enable verbose logging. Defaults to True.
+            compile (bool | str): Compile PyTorch models with torch.compile, True for mode 'default' or a
+                torch.compile mode, i.e. 'max-autotune'. CUDA-graph modes ('reduce-overhead', 'max-autotune')
+                reuse static output buffers, so outputs kept across calls must be cloned. Defaults to False.
         """
         super().__init__()
         w = str(weights[0] if isinstance(weights, list) else weights)
@@ -143,7 +148,7 @@ class AutoBackend(nn.Module):
         fp16 &= pt or jit or onnx or xml or engine or nn_module or triton  # FP16
         nhwc = coreml or saved_model or pb or tflite or edgetpu or rknn  # BHWC formats (vs torch BCWH)
         stride = 32  # default stride
-        end2end, dynamic = False, False
+        end2end, dynamic, channels_last = False, False, False
         model, metadata, task = None, None, None
 
         # Set device
@@ -539,11 +544,20 @@ class AutoBackend(nn.Module):
             names = default_class_names(data)
         names = check_class_names(names)
 
-        # Disable gradients
+        # Disable gradients, NHWC on CUDA, torch.compile (in-memory or loaded PyTorch model)
         if pt:
             for p in model.parameters():
                 p.requires_grad = False
-
+            if cuda:  # NHWC weights let cuDNN pick its Tensor Core kernels without internal layout transposes
+                model.to(memory_format=torch.channels_last)
+                channels_last = True
+            if compile and TORCH_2_0:  # fixed-shape inference; CUDA graphs only on explicit opt-in (static outputs)
+                mode = compile if isinstance(compile, str) else "default"
+                model = self.model = torch.compile(model, mode=mode, dynamic=False)
+        if compile and not (pt and TORCH_2_0):
+            LOGGER.warning(f"WARNING ⚠️ 'compile={compile}' ignored, requires a PyTorch model and torch>=2.0")
+
+        del compile  # would shadow nn.Module.compile() on the instance
         self.__dict__.update(locals())  # assign all variables to self
 
     def forward(self, im, augment=False, visualize=False, embed=None):
@@ -564,6 +578,8 @@ class AutoBackend(nn.Module):
             im = im.half()  # to FP16
         if self.nhwc:
             im = im.permute(0, 2, 3, 1)  # torch BCHW to numpy BHWC shape(1,320,192,3)
+        elif self.channels_last:
+            im = im.contiguous(memory_format=torch.channels_last)  # match the NHWC PyTorch model weights
 
         # PyTorch
         if self.pt or self.nn_module:
@@ -3,10 +3,11 @@
 
 import math
 
-import numpy as np
 import torch
 import torch.nn as nn
 
+from ultralytics.utils.torch_utils import fuse_conv_and_bn
+
 __all__ = (
     "Conv",
     "Conv2",
@@ -34,6 +35,22 @@ def autopad(k, p=None, d=1):  # kernel, padding, dilation
     return p
 
 
+def channel_pool(x, max_first=False):
+    """
+    Stack the channel-wise mean and max of x into a (B, 2, H, W) map for spatial attention.
+
+    Args:
+        x (torch.Tensor): Input tensor of shape (B, C, H, W).
+        max_first (bool): Put the max map in channel 0 instead of the mean map.
+
+    Returns:
+        (torch.Tensor): Pooled tensor of shape (B, 2, H, W).
+    """
+    # amax skips the int64 argmax indices that torch.max(x, 1) also computes and writes
+    pooled = [x.mean(1, keepdim=True), x.amax(1, keepdim=True)]
+    return torch.cat(pooled[::-1] if max_first else pooled, 1)
+
+
 class Conv(nn.Module):
     """
     Standard convolution module with batch normalization and activation.
@@ -117,7 +134,7 @@ class Conv2(Conv):
             act (bool | nn.Module): Activation function.
         """
         super().__init__(c1, c2, k, s, p, g=g, d=d, act=act)
-        self.cv2 = nn.Conv2d(c1, c2, 1, s, autopad(1, p, d), groups=g, dilation=d, bias=False)  # add 1x1 conv
+        self.cv2 = nn.Conv2d(c1, c2, 1, s, 0 if p is None else p, groups=g, dilation=d, bias=False)  # add 1x1 conv
 
     def forward(self, x):
         """
@@ -131,26 +148,16 @@ class Conv2(Conv):
         """
         return self.act(self.bn(self.conv(x) + self.cv2(x)))
 
-    def forward_fuse(self, x):
+    def fuse_convs(self):
         """
-        Apply fused convolution, batch normalization and activation to input tensor.
-
-        Args:
-            x (torch.Tensor): Input tensor.
+        Fuse parallel convolutions.
 
-        Returns:
-            (torch.Tensor): Output tensor.
+        The module then runs as a plain Conv, so BatchNorm can be folded afterwards and `Conv.forward_fuse` used.
         """
-        return self.act(self.bn(self.conv(x)))
-
-    def fuse_convs(self):
-        """Fuse parallel convolutions."""
-        w = torch.zeros_like(self.conv.weight.data)
-        i = [x // 2 for x in w.shape[2:]]
-        w[:, :, i[0] : i[0] + 1, i[1] : i[1] + 1] = self.cv2.weight.data.clone()
-        self.conv.weight.data += w
+        i = [x // 2 for x in self.conv.weight.shape[2:]]
+        self.conv.weight.data[:, :, i[0] : i[0] + 1, i[1] : i[1] + 1] += self.cv2.weight.data  # 1x1 onto center tap
         self.__delattr__("cv2")
-        self.forward = self.forward_fuse
+        self.forward = super().forward
 
 
 class LightConv(nn.Module):
@@ -322,7 +329,11 @@ class Focus(nn.Module):
         Returns:
             (torch.Tensor): Output tensor.
         """
-        return self.conv(torch.cat((x[..., ::2, ::2], x[..., 1::2, ::2], x[..., ::2, 1::2], x[..., 1::2, 1::2]), 1))
+        # Single strided copy equivalent to cat(x[..., ::2, ::2], x[..., 1::2, ::2], x[..., ::2, 1::2], x[..., 1::2, 1::2]);
+        # pixel_unshuffle orders the channels differently, which would break existing Focus weights
+        b, c, h, w = x.shape
+        x = x.view(b, c, h // 2, 2, w // 2, 2).permute(0, 5, 3, 1, 2, 4).reshape(b, 4 * c, h // 2, w // 2)
+        return self.conv(x)
         # return self.conv(self.contract(x))
 
 
@@ -439,8 +450,11 @@ class RepConv(nn.Module):
         Returns:
             (torch.Tensor): Output tensor.
         """
-        id_out = 0 if self.bn is None else self.bn(x)
-        return self.act(self.conv1(x) + self.conv2(x) + id_out)
+        y = self.conv1(x)
+        y += self.conv2(x)  # accumulate branches in place, no temporaries for the sums
+        if self.bn is not None:
+            y += self.bn(x)
+        return self.act(y)
 
     def get_equivalent_kernel_bias(self):
         """
@@ -451,41 +465,28 @@ class RepConv(nn.Module):
                 - Equivalent kernel (torch.Tensor)
                 - Equivalent bias (torch.Tensor)
         """
-        kernel3x3, bias3x3 = self._fuse_bn_tensor(self.conv1)
+        kernel, bias = self._fuse_bn_tensor(self.conv1)  # fresh tensors, accumulated into in place
         kernel1x1, bias1x1 = self._fuse_bn_tensor(self.conv2)
-        kernelid, biasid = self._fuse_bn_tensor(self.bn)
-        return kernel3x3 + self._pad_1x1_to_3x3_tensor(kernel1x1) + kernelid, bias3x3 + bias1x1 + biasid
-
-    @staticmethod
-    def _pad_1x1_to_3x3_tensor(kernel1x1):
-        """
-        Pad a 1x1 kernel to 3x3 size.
-
-        Args:
-            kernel1x1 (torch.Tensor): 1x1 convolution kernel.
-
-        Returns:
-            (torch.Tensor): Padded 3x3 kernel.
-        """
-        if kernel1x1 is None:
-            return 0
-        else:
-            return torch.nn.functional.pad(kernel1x1, [1, 1, 1, 1])
+        kernel[:, :, 1:2, 1:2] += kernel1x1  # 1x1 branch lands on the 3x3 center tap, no padded copy
+        bias += bias1x1
+        if self.bn is not None:
+            kernelid, biasid = self._fuse_bn_tensor(self.bn)
+            kernel += kernelid
+            bias += biasid
+        return kernel, bias
 
     def _fuse_bn_tensor(self, branch):
         """
         Fuse batch normalization with convolution weights.
 
         Args:
-            branch (Conv | nn.BatchNorm2d | None): Branch to fuse.
+            branch (Conv | nn.BatchNorm2d): Branch to fuse.
 
         Returns:
             (tuple): Tuple containing:
                 - Fused kernel (torch.Tensor)
                 - Fused bias (torch.Tensor)
         """
-        if branch is None:
-            return 0, 0
         if isinstance(branch, Conv):
             kernel = branch.conv.weight
             running_mean = branch.bn.running_mean
@@ -496,10 +497,12 @@ class RepConv(nn.Module):
         elif isinstance(branch, nn.BatchNorm2d):
             if not hasattr(self, "id_tensor"):
                 input_dim = self.c1 // self.g
-                kernel_value = np.zeros((self.c1, input_dim, 3, 3), dtype=np.float32)
-                for i in range(self.c1):
-                    kernel_value[i, i % input_dim, 1, 1] = 1
-                self.id_tensor = torch.from_numpy(kernel_value).to(branch.weight.device)
+                kernel_value = torch.zeros(
+                    (self.c1, input_dim, 3, 3), device=branch.weight.device, dtype=branch.weight.dtype
+                )
+                i = torch.arange(self.c1, device=branch.weight.device)
+                kernel_value[i, i % input_dim, 1, 1] = 1
+                self.register_buffer("id_tensor", kernel_value, persistent=False)
             kernel = self.id_tensor
             running_mean = branch.running_mean
             running_var = branch.running_var
@@ -546,8 +549,7 @@ class ChannelAttention(nn.Module):
     Applies attention weights to channels based on global average pooling.
 
     Attributes:
-        pool (nn.AdaptiveAvgPool2d): Global average pooling.
-        fc (nn.Conv2d): Fully connected layer implemented as 1x1 convolution.
+        fc (nn.Conv2d): Fully connected layer stored as a 1x1 convolution and applied as a linear layer.
         act (nn.Sigmoid): Sigmoid activation for attention weights.
 
     References:
@@ -562,7 +564,6 @@ class ChannelAttention(nn.Module):
             channels (int): Number of input channels.
         """
         super().__init__()
-        self.pool = nn.AdaptiveAvgPool2d(1)
         self.fc = nn.Conv2d(channels, channels, 1, 1, 0, bias=True)
         self.act = nn.Sigmoid()
 
@@ -576,7 +577,9 @@ class ChannelAttention(nn.Module):
         Returns:
             (torch.Tensor): Channel-attended output tensor.
         """
-        return x * self.act(self.fc(self.pool(x)))
+        # Pooled (B, C) vector through the 1x1 conv weights as a GEMM instead of a conv on (B, C, 1, 1)
+        w = torch.nn.functional.linear(x.mean((2, 3)), self.fc.weight.flatten(1), self.fc.bias)
+        return x * self.act(w)[..., None, None]
 
 
 class SpatialAttention(nn.Module):
@@ -613,7 +616,7 @@ class SpatialAttention(nn.Module):
         Returns:
             (torch.Tensor): Spatial-attended output tensor.
         """
-        return x * self.act(self.cv1(torch.cat([torch.mean(x, 1, keepdim=True), torch.max(x, 1, keepdim=True)[0]], 1)))
+        return x * self.act(self.cv1(channel_pool(x)))
 
 
 class CBAM(nn.Module):
@@ -732,7 +735,6 @@ class SimAM(nn.Module):
         assert c1 == c2, f"Input channels ({c1}) and output channels ({c2}) must be equal for SimAM."
 
         self.e_lambda = e_lambda
-        self.activation = nn.Sigmoid() # Internal activation for the attention map
 
         # SimAM is parameter-free, so no learnable weights like Conv or BN are defined here.
         # We keep c1 and c2 in the signature for consistency with how parse_model might call it,
@@ -761,12 +763,14 @@ class SimAM(nn.Module):
         # Using the direct formula from the paper for stability:
         # D = (1/n) * sum_i^n (x_i - mu)^2
         # mu = (1/N) * sum_i^N x_i
-        x_minus_mu_square = (x - x.mean(dim=[2, 3], keepdim=True)).pow(2)
+        d2 = (x - x.mean(dim=[2, 3], keepdim=True)).square()
         # Denominator: 4 * (sigma_hat^2 + lambda) where sigma_hat^2 = (1/n) * sum((x - mu)^2)
-        y = x_minus_mu_square / (4 * (x_minus_mu_square.sum(dim=[2, 3], keepdim=True) / n + self.e_lambda)) + 0.5
+        # Inverted once on the (B, C, 1, 1) sums so the full-size tensor is multiplied, not divided
+        inv = (4 * (d2.sum(dim=[2, 3], keepdim=True) / n + self.e_lambda)).reciprocal()
+        y = d2 * inv
 
-        # Apply attention: x * sigmoid(E)
-        return x * self.activation(y)
+        # Apply attention: x * sigmoid(E), the +0.5 and sigmoid done in place on y (autograd-safe: mul does not save y)
+        return x * y.add_(0.5).sigmoid_()
 
     def forward_fuse(self, x):
         """
@@ -797,8 +801,6 @@ class LCAM(nn.Module):
         super().__init__()
         c_ = c1 // r # Intermediate channels
         if c_ == 0: c_ = 1 # Ensure intermediate channels is at least 1
-        self.maxpool = nn.AdaptiveMaxPool2d(1)
-        self.avgpool = nn.AdaptiveAvgPool2d(1)
         # Shared MLP
         self.mlp = nn.Sequential(
             nn.Conv2d(c1, c_, kernel_size=1, stride=1, padding=0, bias=False), # Use Conv2d for MLP on features
@@ -808,11 +810,11 @@ class LCAM(nn.Module):
         self.sigmoid = nn.Sigmoid()
 
     def forward(self, x):
-        x_max = self.maxpool(x)
-        x_avg = self.avgpool(x)
-        x_max = self.mlp(x_max)
-        x_avg = self.mlp(x_avg)
-        channel_att = self.sigmoid(x_max + x_avg)
+        b = x.shape[0]
+        # Global max and avg pooling, stacked along the batch so the shared MLP runs once for both
+        x_pool = torch.cat([x.amax(dim=(2, 3), keepdim=True), x.mean(dim=(2, 3), keepdim=True)]) # Shape: (2B, C, 1, 1)
+        x_mlp = self.mlp(x_pool)
+        channel_att = self.sigmoid(x_mlp[:b] + x_mlp[b:])
         return channel_att # Output shape: (B, C, 1, 1)
 
 class LD_SAM(nn.Module):
@@ -829,11 +831,8 @@ class LD_SAM(nn.Module):
         self.sigmoid = nn.Sigmoid()
 
     def forward(self, x):
-        # Apply max and average pooling along the channel dimension
-        x_max, _ = torch.max(x, dim=1, keepdim=True) # Shape: (B, 1, H, W)
-        x_avg = torch.mean(x, dim=1, keepdim=True)   # Shape: (B, 1, H, W)
-        # Concatenate along the channel dimension
-        x_cat = torch.cat([x_max, x_avg], dim=1)     # Shape: (B, 2, H, W)
+        # Max and average pooling along the channel dimension, concatenated as [max, avg]
+        x_cat = channel_pool(x, max_first=True)     # Shape: (B, 2, H, W)
         # Apply convolution and sigmoid
         spatial_att = self.sigmoid(self.conv(x_cat)) # Shape: (B, 1, H, W)
         return spatial_att
@@ -859,97 +858,22 @@ class LCBHAM(nn.Module):
         # Apply initial convolution block
         x_conv = self.conv_block(x)
 
+        # Without autograd nothing needs the intermediates, so both multiplications reuse x_conv's buffer
+        # (not while tracing, where the trace check may re-run under a different grad mode)
+        inplace = not torch.is_grad_enabled() and not torch.jit.is_tracing()
+
         # Apply Channel Attention (LCAM)
         channel_weights = self.channel_att(x_conv)
-        x_channel_refined = x_conv * channel_weights # Element-wise multiplication
+        x_channel_refined = x_conv.mul_(channel_weights) if inplace else x_conv * channel_weights
 
         # Apply Spatial Attention (LD-SAM)
         spatial_weights = self.spatial_att(x_channel_refined)
-        x_spatial_refined = x_channel_refined * spatial_weights # Element-wise multiplication
+        x_spatial_refined = x_channel_refined.mul_(spatial_weights) if inplace else x_channel_refined * spatial_weights
 
         # Output feature
         return x_spatial_refined
 
-# --- Implementation of LCBHAM ---
-
-class LCAM(nn.Module):
-    """
-    Lightweight Channel Attention Module (LCAM) based on the diagram.
-    Uses a shared MLP for both maxpool and avgpool features.
-    """
-    def __init__(self, c1, r=16): # c1 = input channels, r = reduction ratio
-        super().__init__()
-        c_ = c1 // r # Intermediate channels
-        if c_ == 0: c_ = 1 # Ensure intermediate channels is at least 1
-        self.maxpool = nn.AdaptiveMaxPool2d(1)
-        self.avgpool = nn.AdaptiveAvgPool2d(1)
-        # Shared MLP
-        self.mlp = nn.Sequential(
-            nn.Conv2d(c1, c_, kernel_size=1, stride=1, padding=0, bias=False), # Use Conv2d for MLP on features
-            nn.ReLU(inplace=True),
-            nn.Conv2d(c_, c1, kernel_size=1, stride=1, padding=0, bias=False)
-        )
-        self.sigmoid = nn.Sigmoid()
-
-    def forward(self, x):
-        x_max = self.maxpool(x)
-        x_avg = self.avgpool(x)
-        x_max = self.mlp(x_max)
-        x_avg = self.mlp(x_avg)
-        channel_att = self.sigmoid(x_max + x_avg)
-        return channel_att # Output shape: (B, C, 1, 1)
-
-class LD_SAM(nn.Module):
-    """
-    Lightweight Dilated Spatial Attention Module (LD-SAM) based on the diagram.
-    Note: Diagram shows k=3, not explicitly dilated, but name suggests it.
-           Using standard k=3 conv as per visual representation.
-    """
-    def __init__(self, kernel_size=3): # Kernel size for the spatial conv
-        super().__init__()
-        assert kernel_size % 2 == 1, "Kernel size must be odd for 'same' padding"
-        # Input to conv will have 2 channels (max_pool + avg_pool)
-        self.conv = nn.Conv2d(2, 1, kernel_size=kernel_size, stride=1, padding=autopad(kernel_size), bias=False)
-        self.sigmoid = nn.Sigmoid()
-
-    def forward(self, x):
-        # Apply max and average pooling along the channel dimension
-        x_max, _ = torch.max(x, dim=1, keepdim=True) # Shape: (B, 1, H, W)
-        x_avg = torch.mean(x, dim=1, keepdim=True)   # Shape: (B, 1, H, W)
-        # Concatenate along the channel dimension
-        x_cat = torch.cat([x_max, x_avg], dim=1)     # Shape: (B, 2, H, W)
-        # Apply convolution and sigmoid
-        spatial_att = self.sigmoid(self.conv(x_cat)) # Shape: (B, 1, H, W)
-        return spatial_att
-
-class LCBHAM(nn.Module):
-    """
-    Lightweight Coordinate Attention Block with Hardswish Activation Module (LCBHAM).
-    Combines an initial convolution block with LCAM and LD-SAM.
-    """
-    def __init__(self, c1, c2, k=3, s=2): # c1=input channels, c2=output channels for initial conv
-        super().__init__()
-        # Initial Convolution Block
-        self.conv_block = nn.Sequential(
-            nn.Conv2d(c1, c2, kernel_size=k, stride=s, padding=autopad(k, p=None, d=1), bias=False),
-            nn.BatchNorm2d(c2),
-            nn.Hardswish(inplace=True)
-        )
-        # Attention Modules
-        self.channel_att = LCAM(c2) # Takes output channels of conv_block
-        self.spatial_att = LD_SAM(kernel_size=3) # Using k=3 as shown in diagram
-
-    def forward(self, x):
-        # Apply initial convolution block
-        x_conv = self.conv_block(x)
-
-        # Apply Channel Attention (LCAM)
-        channel_weights = self.channel_att(x_conv)
-        x_channel_refined = x_conv * channel_weights # Element-wise multiplication
-
-        # Apply Spatial Attention (LD-SAM)
-        spatial_weights = self.spatial_att(x_channel_refined)
-        x_spatial_refined = x_channel_refined * spatial_weights # Element-wise multiplication
-
-        # Output feature
-        return x_spatial_refined
\ No newline at end of file
+    def fuse(self):
+        """Fold the conv_block BatchNorm into its conv for inference, keeping the Sequential indices."""
+        self.conv_block[0] = fuse_conv_and_bn(self.conv_block[0], self.conv_block[1])
+        self.conv_block[1] = nn.Identity()
\ No newline at end of file
@@ -221,6 +221,10 @@ class BaseModel(torch.nn.Module):
                 if isinstance(m, RepVGGDW):
                     m.fuse()
                     m.forward = m.forward_fuse
+                if isinstance(m, LCBHAM) and isinstance(m.conv_block[1], torch.nn.BatchNorm2d):
+                    m.fuse()
+                if isinstance(m, (Conv, RepConv)) and type(m.act) is torch.nn.SiLU:
+                    m.act = torch.nn.SiLU(inplace=True)  # forward_fuse activates a fresh conv output, safe to overwrite
             self.info(verbose=verbose)
 
         return self
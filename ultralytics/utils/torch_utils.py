@@ -254,15 +254,15 @@ def fuse_conv_and_bn(conv, bn):
         .to(conv.weight.device)
     )
 
+    # Per-channel BN scale gamma / sqrt(var + eps), applied as a broadcast instead of a diagonal matmul
+    scale = bn.weight * torch.rsqrt(bn.running_var + bn.eps)
+
     # Prepare filters
-    w_conv = conv.weight.view(conv.out_channels, -1)
-    w_bn = torch.diag(bn.weight.div(torch.sqrt(bn.eps + bn.running_var)))
-    fusedconv.weight.copy_(torch.mm(w_bn, w_conv).view(fusedconv.weight.shape))
+    fusedconv.weight.copy_(conv.weight * scale.view(-1, 1, 1, 1))
 
     # Prepare spatial bias
     b_conv = torch.zeros(conv.weight.shape[0], device=conv.weight.device) if conv.bias is None else conv.bias
-    b_bn = bn.bias - bn.weight.mul(bn.running_mean).div(torch.sqrt(bn.running_var + bn.eps))
-    fusedconv.bias.copy_(torch.mm(w_bn, b_conv.reshape(-1, 1)).reshape(-1) + b_bn)
+    fusedconv.bias.copy_((b_conv - bn.running_mean) * scale + bn.bias)
 
     return fusedconv
 